@@ -6,20 +6,54 @@ and appending a count in parentheses when a game appears multiple times.
 """
 
 import csv
+import functools
+import gzip
 import html
-from collections import defaultdict
+import json
+import os
+import re
+import shutil
 from pathlib import Path
+from typing import TextIO
 from urllib.parse import unquote
 
 # Paths
 CSV_PATH    = Path("itch_purchases.csv")
 OUTPUT_PATH = Path("itch_catalog.html")
+GZIP_PATH   = OUTPUT_PATH.with_suffix(".html.gz")
 
 # External assets
 DATATABLES_CSS = "https://cdn.datatables.net/1.13.6/css/jquery.dataTables.min.css"
 JQUERY_JS      = "https://code.jquery.com/jquery-3.7.1.min.js"
 DATATABLES_JS  = "https://cdn.datatables.net/1.13.6/js/jquery.dataTables.min.js"
 
+# Characters html.escape(..., quote=True) rewrites
+_ESCAPE_RE = re.compile(r"[&<>\"']")
+
+# Columns written by itch_scraper.py
+CSV_COLUMNS = (
+    "Thumbnail", "Game Name", "Author", "Game Page Link",
+    "Category", "Genre", "Tags", "Price", "Description",
+)
+
+# Cover cell: small thumbnail plus the zoomed copy shown on hover
+IMG_TMPL = (
+    '<div class="thumb-wrapper">'
+    '<img class="thumb" src="{u}">'
+    '<img class="zoomed" src="{u}">'
+    "</div>"
+)
+
+# Row serialiser for the GAMES array; json.dumps with non-default
+# options would build a fresh JSONEncoder on every call
+_encode_row = json.JSONEncoder(ensure_ascii=False).encode
+
+# Collapsible description shown under the title
+DETAILS_TMPL = (
+    '<details style="margin-top:4px;"><summary style="cursor:pointer;">Description</summary>'
+    '<div style="margin-top:6px; white-space:pre-wrap; font-size:0.9em; line-height:1.4;">{}</div></details>'
+)
+
 # HTML header (same as before)
 HTML_HEADER = f"""<!DOCTYPE html>
 <html lang="en">
@@ -77,18 +111,22 @@ HTML_HEADER = f"""<!DOCTYPE html>
         <th>Category</th><th>Genre</th><th>Tags</th><th>Price</th>
       </tr>
     </thead>
-    <tbody>
+    <tbody></tbody>
+  </table>
+  <script>
+  const GAMES = [
 """
 
 # HTML footer with JS (same dropdown-on-Category logic)
-HTML_FOOTER = f"""
-    </tbody>
-  </table>
+HTML_FOOTER = f"""  ];
+  </script>
   <script src="{JQUERY_JS}"></script>
   <script src="{DATATABLES_JS}"></script>
   <script>
   $(document).ready(function(){{
     const table = $('#games').DataTable({{
+      data: GAMES,
+      deferRender: true,
       orderCellsTop: true,
       fixedHeader: true,
       pageLength: 25,
@@ -188,15 +226,26 @@ HTML_FOOTER = f"""
 
 def safe_text(value: str) -> str:
     """Strip text or return 'N/A'."""
-    txt = (value or "").strip()
+    if not value:
+        return "N/A"
+    # Usually unpadded: two end checks avoid a copy from strip()
+    if not (value[0].isspace() or value[-1].isspace()):
+        return value
+    txt = value.strip()
     return txt if txt else "N/A"
 
 def safe_html(value: str) -> str:
     """Escape for HTML."""
-    return html.escape(value or "", quote=True)
+    if not value:
+        return ""
+    # Most fields have nothing to escape; hand those back untouched.
+    if _ESCAPE_RE.search(value) is None:
+        return value
+    return html.escape(value, quote=True)
 
+@functools.lru_cache(maxsize=8192)
 def make_chips(cell: str) -> str:
-    """Create clickable filter chips from comma-separated tags."""
+    """Create clickable filter chips from comma-separated tags (memoised)."""
     if not cell or not cell.strip():
         return "N/A"
     tags = [t.strip() for t in cell.split(",") if t.strip()]
@@ -207,37 +256,84 @@ def make_chips(cell: str) -> str:
         for tag in tags
     )
 
-def build_rows(csv_path: Path) -> str:
+def games_entry(cells: list[str]) -> str:
+    """Serialise one table row as a line of the inline GAMES array."""
+    # Escaping every "<" keeps "</script" and "<!--" from breaking the block
+    return _encode_row(cells).replace("<", "\\u003c") + ",\n"
+
+def thumb_exists(thumb_path: Path,
+                 listings: dict[Path, set[str] | None]) -> bool:
+    """Check for a local thumbnail, scanning each folder only once."""
+    folder = thumb_path.parent
+    if folder in listings:
+        names = listings[folder]
+    else:
+        try:
+            with os.scandir(folder) as entries:
+                names = {os.path.normcase(entry.name) for entry in entries}
+        except OSError:
+            names = None  # no such folder (or a remote URL)
+        listings[folder] = names
+    if names is None:
+        return False
+    if os.path.normcase(thumb_path.name) in names:
+        return True
+    # Let the filesystem settle case/Unicode-normalisation differences
+    return thumb_path.exists()
+
+def write_rows(out: TextIO, csv_path: Path) -> None:
     """
     Read the CSV, group rows by (Game Name, Game Page Link),
-    then emit one <tr> per group, appending ' (n)' to titles
-    when count > 1.
+    then write one GAMES array entry per group to `out`,
+    appending ' (n)' to titles when count > 1.
     """
-    groups = defaultdict(list)
+    # key -> [count, first record]; only the first record's metadata is used
+    groups: dict[tuple[str, str], list] = {}
 
     # 1) Read & group
-    with csv_path.open(newline="", encoding="utf-8") as f:
-        for record in csv.DictReader(f):
-            key = (
-                record.get("Game Name", "").strip(),
-                record.get("Game Page Link", "").strip()
-            )
-            groups[key].append(record)
+    # Long descriptions can exceed csv's default 128 KiB field limit
+    csv.field_size_limit(max(csv.field_size_limit(), 1 << 20))
+    with csv_path.open(newline="", encoding="utf-8", buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        idx = {name: i for i, name in enumerate(header)}
+        # Columns missing from the header read a padding cell just past it
+        pad = len(header)
+        cols = [idx.get(name, pad) for name in CSV_COLUMNS]
+        (i_thumb, i_name, i_author, i_link, i_cat,
+         i_genre, i_tags, i_price, i_desc) = cols
+        missing = pad in cols
+        width = max(cols) + 1
+        for record in reader:
+            if not record:
+                continue  # blank line, skipped like csv.DictReader did
+            if missing:
+                # Drop stray trailing fields so the padding cell stays empty
+                del record[pad:]
+                record.append("")
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            key = (record[i_name].strip(), record[i_link].strip())
+            entry = groups.get(key)
+            if entry is None:
+                groups[key] = [1, record]
+            else:
+                entry[0] += 1
 
-    rows = []
-    # 2) Build one row per group
-    for (game_name, page_link), records in sorted(groups.items()):
-        count = len(records)
-        first = records[0]  # assume metadata is identical
+    # 2) Write one row per group
+    listings: dict[Path, set[str] | None] = {}
+    # Case-insensitive by title; same-titled games keep their CSV order
+    for key in sorted(groups, key=lambda k: k[0].casefold()):
+        game_name, page_link = key
+        count, first = groups[key]
         # Thumbnail
-        thumb_url = unquote(first.get("Thumbnail", ""))
-        thumb_path = Path(thumb_url)
-        if thumb_url and thumb_path.exists():
-            img = (
-                '<div class="thumb-wrapper">'
-                f'<img class="thumb" src="{thumb_url}">'
-                f'<img class="zoomed" src="{thumb_url}">'
-                "</div>"
+        # The saved page stores a percent-encoded relative URL; browsers
+        # take it as-is, only the on-disk lookup needs it decoded.
+        thumb_url = first[i_thumb]
+        thumb_file = unquote(thumb_url) if "%" in thumb_url else thumb_url
+        if thumb_url and thumb_exists(Path(thumb_file), listings):
+            img = IMG_TMPL.format(
+                u=thumb_url.replace("&", "&amp;").replace('"', "&quot;")
             )
         else:
             img = "N/A"
@@ -246,40 +342,41 @@ def build_rows(csv_path: Path) -> str:
         title = safe_html(game_name or "N/A")
         suffix = f" ({count})" if count > 1 else ""
         link = safe_html(page_link or "#")
-        description = safe_html(first.get("Description", ""))
+        description = first[i_desc].strip()
         details_html = (
-            f'<details style="margin-top:4px;"><summary style="cursor:pointer;">Description</summary>'
-            f'<div style="margin-top:6px; white-space:pre-wrap; font-size:0.9em; line-height:1.4;">{description}</div></details>'
-            if description != "N/A" else ""
+            DETAILS_TMPL.format(safe_html(description)) if description else ""
         )
         title_cell = f'<a href="{link}" target="_blank">{title}{suffix}</a>{details_html}'
 
         # Other columns
-        author   = safe_html(first.get("Author", ""))
-        category = make_chips(first.get("Category", ""))
-        genre    = make_chips(first.get("Genre", ""))
-        tags     = make_chips(first.get("Tags", ""))
-        price    = safe_text(first.get("Price", ""))
-
-        row_html = f"""
-        <tr>
-          <td>{img}</td>
-          <td>{title_cell}</td>
-          <td>{author}</td>
-          <td>{category}</td>
-          <td>{genre}</td>
-          <td>{tags}</td>
-          <td>{price}</td>
-        </tr>
-        """.rstrip()
-        rows.append(row_html)
+        author   = safe_html(first[i_author])
+        category = make_chips(first[i_cat])
+        genre    = make_chips(first[i_genre])
+        tags     = make_chips(first[i_tags])
+        price    = safe_text(first[i_price])
 
-    return "\n".join(rows)
+        out.write(games_entry(
+            [img, title_cell, author, category, genre, tags, price]
+        ))
 
-def main():
-    html_content = HTML_HEADER + build_rows(CSV_PATH) + HTML_FOOTER
-    OUTPUT_PATH.write_text(html_content, encoding="utf-8")
-    print(f"✅ Interactive catalog written to {OUTPUT_PATH}")
+def main() -> None:
+    # Stream into a sibling temp file so a missing or bad CSV never
+    # leaves a half-written page in place of the previous catalog
+    tmp_path = OUTPUT_PATH.with_name(OUTPUT_PATH.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8", buffering=1 << 20) as out:
+            out.write(HTML_HEADER)
+            write_rows(out, CSV_PATH)
+            out.write(HTML_FOOTER)
+        os.replace(tmp_path, OUTPUT_PATH)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    # Pre-compressed copy for static hosts that serve .gz directly
+    with OUTPUT_PATH.open("rb") as src, \
+            gzip.open(GZIP_PATH, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    print(f"✅ Interactive catalog written to {OUTPUT_PATH} (+ {GZIP_PATH})")
 
 if __name__ == "__main__":
     main()